@@ -1,165 +1,88 @@
+import asyncio
 import os
-from typing import Any, Dict, List, Union
+from typing import Any
 
-from fastapi import FastAPI, Request, Header
+import orjson
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ValidationError
+from starlette.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 
+from rpc import err, handle_rpc
+
 load_dotenv()
-AUTH_TOKEN = os.getenv("AUTH_TOKEN")
-MY_NUMBER = os.getenv("MY_NUMBER")
 PORT = int(os.getenv("PORT", "8086"))
+MAX_BODY_BYTES = 65536
+MAX_BATCH = 100
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "256"))
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
 
-app = FastAPI()
-
-
-# ---------- JSON-RPC ----------
-class JsonRpcRequest(BaseModel):
-    jsonrpc: str
-    id: Union[str, int, None] = None
-    method: str
-    params: Dict[str, Any] | None = None
-
-
-def ok(_id, result):
-    return {"jsonrpc": "2.0", "id": _id, "result": result}
-
-
-def err(_id, code, message):
-    return {"jsonrpc": "2.0", "id": _id, "error": {"code": code, "message": message}}
-
-
-# ---------- utils ----------
-def get_token(authorization: str | None, args: Dict[str, Any] | None) -> str | None:
-    # header first
-    if authorization and authorization.startswith("Bearer "):
-        return authorization.split(" ", 1)[1]
-    # then payload (MCP tools/call passes params.arguments.token)
-    if args and "token" in args:
-        return args.get("token")
-    return None
-
-
-# ---------- handlers ----------
-def handle_rpc(rpc: JsonRpcRequest, authorization: str | None) -> Dict[str, Any]:
-    method = rpc.method
-    params = rpc.params or {}
-
-    # 1) MCP handshake
-    if method == "initialize":
-        return ok(rpc.id, {
-            "serverInfo": {"name": "mcp-jd-kit", "version": "0.1.0"},
-            "protocolVersion": "2024-06-01",
-            "capabilities": {
-                "tools": {"listChanged": False}
-            }
-        })
-
-    # 2) tools/list
-    if method == "tools/list":
-        return ok(rpc.id, {
-            "tools": [
-                {
-                    "name": "validate",
-                    "description": "Return owner phone as a string. Token via Authorization header or arguments.token.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "token": {"type": "string", "description": "Bearer token"}
-                        }
-                    }
-                },
-                {
-                    "name": "ping",
-                    "description": "Liveness check.",
-                    "inputSchema": {"type": "object", "properties": {}}
-                }
-            ]
-        })
-
-    # 3) tools/call (Puch calls validate/ping through here)
-    if method == "tools/call":
-        name = params.get("name")
-        arguments = params.get("arguments", {}) if isinstance(params, dict) else {}
-
-        if name == "validate":
-            incoming_token = get_token(authorization, arguments)
-            if not incoming_token:
-                return ok(rpc.id, {"error": {"code": -32001, "message": "Missing token"}})
-            if AUTH_TOKEN is None:
-                return ok(rpc.id, {"error": {"code": -32003, "message": "Server misconfigured: AUTH_TOKEN missing"}})
-            if incoming_token != AUTH_TOKEN:
-                return ok(rpc.id, {"error": {"code": -32002, "message": "Invalid token"}})
-            if not MY_NUMBER:
-                return ok(rpc.id, {"error": {"code": -32000, "message": "Server missing MY_NUMBER"}})
-            # MCP tool result content
-            return ok(rpc.id, {"content": [{"type": "text", "text": MY_NUMBER}]})
-
-        if name == "ping":
-            return ok(rpc.id, {"content": [{"type": "text", "text": "pong"}]})
-
-        return err(rpc.id, -32601, f"Unknown tool: {name}")
-
-    # Optional direct calls (for manual testing)
-    if method == "ping":
-        return ok(rpc.id, {"pong": True})
-
-    if method == "tools.list":  # backward-compat if a client uses dot form
-        return ok(rpc.id, {
-            "tools": [
-                {
-                    "name": "validate",
-                    "description": "Return owner phone as string.",
-                    "inputSchema": {"type": "object", "properties": {"token": {"type": "string"}}}
-                },
-                {
-                    "name": "ping",
-                    "description": "Liveness check.",
-                    "inputSchema": {"type": "object", "properties": {}}
-                }
-            ]
-        })
-
-    # Unknown method
-    return err(rpc.id, -32601, f"Method not found: {method}")
+
+# per-worker cap on /mcp requests being handled at once
+inflight = asyncio.Semaphore(MAX_INFLIGHT)
+
+app = FastAPI(default_response_class=ORJSONResponse)
+# only kicks in when the client sends Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
 
 
 # ---------- routes ----------
-@app.get("/")
-def root():
-    return {"ok": True, "message": "MCP endpoint at /mcp"}
+# Probe responses never change; render their bodies once
+ROOT_RESPONSE = ORJSONResponse({"ok": True, "message": "MCP endpoint at /mcp"})
+HEALTH_RESPONSE = ORJSONResponse({"status": "ok"})
+
+
+@app.get("/", include_in_schema=False)
+async def root():
+    return ROOT_RESPONSE
 
 
-@app.get("/health")
-def health():
-    return {"status": "ok"}
+@app.get("/health", include_in_schema=False)
+async def health():
+    return HEALTH_RESPONSE
 
 
-@app.post("/mcp")
-async def mcp(request: Request, authorization: str | None = Header(default=None, convert_underscores=False)):
+# Plain Starlette route: skips FastAPI's dependency solver on the hot path
+async def mcp(request: Request) -> ORJSONResponse:
+    # Shed load instead of queueing once every slot is taken
+    if inflight.locked():
+        return ORJSONResponse(err(None, -32000, "Overloaded"), status_code=503)
+    async with inflight:
+        return await dispatch(request)
+
+
+async def dispatch(request: Request) -> ORJSONResponse:
+    authorization = request.headers.get("authorization")
+    # Refuse oversized payloads before reading/parsing them
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return ORJSONResponse(err(None, -32600, "Payload too large"), status_code=413)
+    raw = await request.body()
+    if len(raw) > MAX_BODY_BYTES:  # chunked bodies carry no content-length
+        return ORJSONResponse(err(None, -32600, "Payload too large"), status_code=413)
+
     # Accept both single and batch JSON-RPC
     try:
-        body = await request.json()
+        body = orjson.loads(raw)
     except Exception:
-        return JSONResponse(err(None, -32700, "Parse error"), status_code=200)
+        return ORJSONResponse(err(None, -32700, "Parse error"))
 
-    try:
-        if isinstance(body, list):
-            results: List[Dict[str, Any]] = []
-            for item in body:
-                try:
-                    rpc = JsonRpcRequest(**item)
-                    results.append(handle_rpc(rpc, authorization))
-                except ValidationError:
-                    results.append(err(item.get("id", None), -32600, "Invalid Request"))
-            return JSONResponse(results, status_code=200)
-        else:
-            rpc = JsonRpcRequest(**body)
-            result = handle_rpc(rpc, authorization)
-            return JSONResponse(result, status_code=200)
-    except ValidationError:
-        return JSONResponse(err(None, -32600, "Invalid Request"), status_code=200)
+    if isinstance(body, list):
+        if len(body) > MAX_BATCH:
+            return ORJSONResponse(err(None, -32600, "Batch too large"))
+        results = await asyncio.gather(*(handle_rpc(item, authorization) for item in body))
+        return ORJSONResponse(results)
+
+    return ORJSONResponse(await handle_rpc(body, authorization))
+
+
+app.add_route("/mcp", mcp, methods=["POST"], include_in_schema=False)
 
 
 # ---------- run uvicorn when executed directly (Railway uses: python main.py) ----------
@@ -168,6 +91,10 @@ if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
-        port=int(os.environ.get("PORT", "8000")),
+        port=PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)),
+        access_log=False,
         reload=False
     )
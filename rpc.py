@@ -0,0 +1,196 @@
+# Pure JSON-RPC dispatch, kept free of FastAPI so it can be AOT-compiled
+# with mypyc (`mypyc rpc.py`); the plain .py is used when no build exists.
+import hmac
+import os
+from typing import Any, Callable, Dict, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+AUTH_TOKEN = os.getenv("AUTH_TOKEN")
+MY_NUMBER = os.getenv("MY_NUMBER")
+AUTH_TOKEN_B = AUTH_TOKEN.encode() if AUTH_TOKEN else None
+BEARER_PREFIX = "bearer "  # matched case-insensitively
+
+
+# ---------- JSON-RPC ----------
+def ok(_id: Any, result: Any) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": _id, "result": result}
+
+
+def err(_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": _id, "error": {"code": code, "message": message}}
+
+
+# ---------- static results (built once, reused per call) ----------
+INITIALIZE_RESULT = {
+    "serverInfo": {"name": "mcp-jd-kit", "version": "0.1.0"},
+    "protocolVersion": "2024-06-01",
+    "capabilities": {
+        "tools": {"listChanged": False}
+    }
+}
+
+TOOLS_LIST_RESULT = {
+    "tools": [
+        {
+            "name": "validate",
+            "description": "Return owner phone as a string. Token via Authorization header or arguments.token.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "token": {"type": "string", "description": "Bearer token"}
+                }
+            }
+        },
+        {
+            "name": "ping",
+            "description": "Liveness check.",
+            "inputSchema": {"type": "object", "properties": {}}
+        }
+    ]
+}
+
+# backward-compat shape for clients using the dot form
+TOOLS_LIST_DOT_RESULT = {
+    "tools": [
+        {
+            "name": "validate",
+            "description": "Return owner phone as string.",
+            "inputSchema": {"type": "object", "properties": {"token": {"type": "string"}}}
+        },
+        {
+            "name": "ping",
+            "description": "Liveness check.",
+            "inputSchema": {"type": "object", "properties": {}}
+        }
+    ]
+}
+
+PING_RESULT = {"pong": True}
+TOOL_PING_RESULT = {"content": [{"type": "text", "text": "pong"}]}
+# MCP tool result content
+VALIDATE_RESULT: Dict[str, Any] | None = {"content": [{"type": "text", "text": MY_NUMBER}]} if MY_NUMBER else None
+
+# validate failures are reported inside the tool result
+MISSING_TOKEN_RESULT = {"error": {"code": -32001, "message": "Missing token"}}
+INVALID_TOKEN_RESULT = {"error": {"code": -32002, "message": "Invalid token"}}
+NO_AUTH_TOKEN_RESULT = {"error": {"code": -32003, "message": "Server misconfigured: AUTH_TOKEN missing"}}
+NO_NUMBER_RESULT = {"error": {"code": -32000, "message": "Server missing MY_NUMBER"}}
+
+
+# ---------- utils ----------
+def get_token(authorization: str | None, args: Dict[str, Any] | None) -> Any:
+    # header first
+    n = len(BEARER_PREFIX)
+    if authorization is not None and len(authorization) > n and authorization[:n].lower() == BEARER_PREFIX:
+        return authorization[n:]
+    # then payload (MCP tools/call passes params.arguments.token)
+    if args and "token" in args:
+        return args.get("token")
+    return None
+
+
+# Tokens that already passed compare_digest. Only matches are remembered, so an
+# unknown token always pays the constant-time compare; at most AUTH_TOKEN lands here.
+VERIFIED_TOKENS: Set[str] = set()
+
+
+def token_matches(token: Any) -> bool:
+    if not isinstance(token, str) or AUTH_TOKEN_B is None:
+        return False
+    if token in VERIFIED_TOKENS:
+        return True
+    if not hmac.compare_digest(token.encode(), AUTH_TOKEN_B):
+        return False
+    VERIFIED_TOKENS.add(token)
+    return True
+
+
+# ---------- handlers ----------
+def is_valid_request(item: Any) -> bool:
+    return (
+        isinstance(item, dict)
+        and item.get("jsonrpc") == "2.0"
+        and isinstance(item.get("method"), str)
+        and isinstance(item.get("params") or {}, dict)
+    )
+
+
+# every handler takes (id, params-or-arguments, authorization header)
+Handler = Callable[[Any, Dict[str, Any], str | None], Dict[str, Any]]
+
+
+# tools/call targets (Puch calls validate/ping through here)
+def _tool_validate(_id: Any, arguments: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    incoming_token = get_token(authorization, arguments)
+    if not incoming_token:
+        return ok(_id, MISSING_TOKEN_RESULT)
+    if AUTH_TOKEN_B is None:
+        return ok(_id, NO_AUTH_TOKEN_RESULT)
+    if not token_matches(incoming_token):
+        return ok(_id, INVALID_TOKEN_RESULT)
+    if VALIDATE_RESULT is None:
+        return ok(_id, NO_NUMBER_RESULT)
+    return ok(_id, VALIDATE_RESULT)
+
+
+def _tool_ping(_id: Any, arguments: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    return ok(_id, TOOL_PING_RESULT)
+
+
+TOOL_DISPATCH: Dict[str, Handler] = {
+    "validate": _tool_validate,
+    "ping": _tool_ping,
+}
+
+
+# JSON-RPC methods
+def _initialize(_id: Any, params: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    # MCP handshake
+    return ok(_id, INITIALIZE_RESULT)
+
+
+def _tools_list(_id: Any, params: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    return ok(_id, TOOLS_LIST_RESULT)
+
+
+def _tools_call(_id: Any, params: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    name = params.get("name")
+    arguments = params.get("arguments")
+    if not isinstance(arguments, dict):
+        arguments = {}
+    tool = TOOL_DISPATCH.get(name) if isinstance(name, str) else None
+    if tool is None:
+        return err(_id, -32601, f"Unknown tool: {name}")
+    return tool(_id, arguments, authorization)
+
+
+def _ping(_id: Any, params: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    # direct call, for manual testing
+    return ok(_id, PING_RESULT)
+
+
+def _tools_list_dot(_id: Any, params: Dict[str, Any], authorization: str | None) -> Dict[str, Any]:
+    # backward-compat if a client uses dot form
+    return ok(_id, TOOLS_LIST_DOT_RESULT)
+
+
+METHOD_DISPATCH: Dict[str, Handler] = {
+    "initialize": _initialize,
+    "tools/list": _tools_list,
+    "tools/call": _tools_call,
+    "ping": _ping,
+    "tools.list": _tools_list_dot,
+}
+
+
+async def handle_rpc(item: Any, authorization: str | None) -> Dict[str, Any]:
+    if not is_valid_request(item):
+        return err(item.get("id") if isinstance(item, dict) else None, -32600, "Invalid Request")
+    _id = item.get("id")
+    method = item["method"]
+    handler = METHOD_DISPATCH.get(method)
+    if handler is None:
+        return err(_id, -32601, f"Method not found: {method}")
+    return handler(_id, item.get("params") or {}, authorization)